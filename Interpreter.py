@@ -1,8 +1,23 @@
 # Gambl/new_interpreter.py
 # Evaluation and Interpretation Logic
 
-from ast_nodes import Number, Variable, BinOp, UnaryOp, Assignment, If, While, FunctionDef, Call, FunctionValue, ReturnValue, Block, ArrayLiteral, Index, AssignIndex, String
-from environment import Env
+from ast_nodes import Number, Variable, BinOp, UnaryOp, Assignment, If, While, FunctionDef, Call, FunctionValue, ReturnValue, Block, ArrayLiteral, Index, AssignIndex, String, InPlaceOp
+from environment import Env, Reference, UNBOUND
+from operators import BINOPS, LOGIC_OPS
+
+class _Return(RuntimeError):
+    """
+    Raised by a return statement and caught by the enclosing call, so a
+    return nested inside if/while still ends the function. Reaching the
+    top level unhandled reports as an ordinary runtime error.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return "'return' outside function"
 
 def evaluate(node, env):
     """
@@ -15,166 +30,316 @@ def evaluate(node, env):
     Returns:
         The result of evaluating the node
     """
-    if isinstance(node, Number):
-        return node.value
-    
-    elif isinstance(node, String):
-        return node.value
+    try:
+        handler = _DISPATCH[type(node)]
+    except KeyError:
+        raise RuntimeError(f"Unknown AST node: {type(node)}") from None
+    return handler(node, env)
 
-    elif isinstance(node, Variable):
-        val = env.get(node.name)
-    # If it's a Reference, get the value
-        if hasattr(val, 'get') and callable(val.get):
-            return val.get()
-        return val
-    
-    elif isinstance(node, BinOp):
-        left = evaluate(node.left, env)
-        right = evaluate(node.right, env)
-
-        if node.op == "+":
-            return left + right
-        elif node.op == "-":
-            return left - right
-        elif node.op == "*":
-            return left * right
-        elif node.op == "/":
-            return left // right
-        elif node.op == "%":
-            return left % right
-        elif node.op == "^":
-            return left ** right
-        elif node.op == "==":
-            return left == right
-        elif node.op == "<":
-            return left < right
-        elif node.op == ">":
-            return left > right
-        elif node.op == "<=":
-            return left <= right
-        elif node.op == ">=":
-            return left >= right
-        elif node.op == "and":
-            return left and right
-        elif node.op == "or":
-            return left or right
-        else:
-            raise RuntimeError(f"Unknown operator: {node.op}")
+def _eval_number(node, env):
+    return node.value
 
-    elif isinstance(node, While):
-        result = None
-        while True:
-            condition = evaluate(node.condition, env)  # Check condition again
-            if not condition:
-                break
-            result = evaluate(node.body, env)  # Just run the body
-        return result  # Last result
+def _eval_string(node, env):
+    return node.value
 
-    elif isinstance(node, If):
-        condition = evaluate(node.condition, env)
-        if condition:
-            return evaluate(node.then_branch, env) if node.then_branch else None
+def _eval_variable(node, env):
+    if node.slot is not None:
+        val = env.slots[node.slot]
+        if val is UNBOUND:
+            # Local not assigned yet; read the enclosing value
+            val = env.get(node.name)
+    else:
+        if env.slots is not None and not env.variables:
+            # In a function frame every local has a slot, so this name lives
+            # in the enclosing scope; caching on that scope (which outlives
+            # the call) lets the next call hit the cache too
+            env = env.parent
+        if node._ic_env is env and node._ic_version == env.version:
+            val = node._ic_scope.variables[node.name]
         else:
-            return evaluate(node.else_branch, env) if node.else_branch else None
+            val = env.get(node.name)
+            scope = _dict_scope(env, node.name)
+            if scope is not None:
+                node._ic_env = env
+                node._ic_version = env.version
+                node._ic_scope = scope
+    # If it's a Reference, get the value
+    if type(val) is Reference:
+        return val.get()
+    return val
+
+def _dict_scope(env, name):
+    """
+    Find which of env and its parent answers env.get(name) from its variables
+    dict. Deeper scopes are not cached: only env's version is checked, so a
+    new definition in an intermediate scope would go unnoticed.
     
-    elif isinstance(node, UnaryOp):
-        operand = evaluate(node.operand, env)
-        if node.op == "not":
-            return not operand
-        elif node.op == "-":
-            return -operand
+    Returns:
+        Env or None: the scope to cache, or None if the lookup isn't cacheable
+    """
+    for scope in (env, env.parent):
+        if scope is None:
+            return None
+        if scope.slot_index is not None and name in scope.slot_index:
+            return None
+        if name in scope.variables:
+            return scope
+    return None
+
+def _eval_binop(node, env):
+    # The operator is looked up once, when the node is first compiled
+    if node._compiled is None:
+        node._compiled = _compile(node)
+    return node._compiled(env)
+
+def _eval_while(node, env):
+    if node._compiled is None:
+        node._compiled = (_compile(node.condition), _compile(node.body))
+    condition, body = node._compiled
+    result = None
+    while condition(env):
+        result = body(env)  # Just run the body
+    return result  # Last result
+
+def _eval_if(node, env):
+    if node._cond is None:
+        node._cond = _compile(node.condition)
+    if node._cond(env):
+        return evaluate(node.then_branch, env) if node.then_branch else None
+    else:
+        return evaluate(node.else_branch, env) if node.else_branch else None
+
+def _eval_unaryop(node, env):
+    operand = evaluate(node.operand, env)
+    if node.op == "not":
+        return not operand
+    elif node.op == "-":
+        return -operand
+    else:
+        raise RuntimeError(f"Unknown unary operator: {node.op}")
+
+def _eval_array_literal(node, env):
+    return [evaluate(x, env) for x in node.items]
+
+def _eval_index(node, env):
+    base = evaluate(node.base, env)
+    idx = evaluate(node.index, env)
+    if not isinstance(idx, int):
+        raise TypeError("Index must be integer")
+    return base[idx]
+
+def _eval_assign_index(node, env):
+    base = evaluate(node.base, env)
+    idx = evaluate(node.index, env)
+    expr_val = evaluate(node.expr, env)
+    if not isinstance(idx, int):
+        raise TypeError("Index must be integer")
+    base[idx] = expr_val
+    return None  # Assignment returns no value
+
+def _eval_assignment(node, env):
+    value = evaluate(node.value, env)
+    if node.slot is not None:
+        var = env.slots[node.slot]
+        if type(var) is not Reference:
+            env.slots[node.slot] = value
+            return None
+    if node._ic_env is env:
+        var = env.variables[node.name]
+        if type(var) is not Reference:
+            env.variables[node.name] = value
+            return None
+    # Set through Reference if needed
+    var = None
+    try:
+        var = env.get(node.name)
+    except Exception:
+        pass
+    if type(var) is Reference:
+        var.set(value)
+    else:
+        env.set(node.name, value)
+        if _dict_scope(env, node.name) is env:
+            node._ic_env = env
+    return None  # Assignments return no value
+
+def _eval_inplace_op(node, env):
+    if node.slot is not None:
+        var = env.slots[node.slot]
+        if var is not UNBOUND and type(var) is not Reference:
+            env.slots[node.slot] = BINOPS[node.op](var, node.value)
+            return None
+    if node._ic_env is env:
+        var = env.variables[node.name]
+        if type(var) is not Reference:
+            env.variables[node.name] = BINOPS[node.op](var, node.value)
+            return None
+    var = env.get(node.name)
+    # Set through Reference if needed
+    if type(var) is Reference:
+        var.set(BINOPS[node.op](var.get(), node.value))
+    else:
+        env.set(node.name, BINOPS[node.op](var, node.value))
+        if _dict_scope(env, node.name) is env:
+            node._ic_env = env
+    return None  # Assignments return no value
+
+def _eval_function_def(node, env):
+    # Store the function in the environment
+    func_value = FunctionValue(node.params, node.statements, env, node.slot_index)
+    env.set(node.name, func_value)
+    return None  # Defining a function returns nothing
+
+def _eval_call(node, env):
+    func = env.get(node.name)
+    # Built-in function (Python callable)
+    if type(func) is not FunctionValue:
+        if callable(func):
+            return func(*[evaluate(arg, env) for arg in node.args])
+        raise RuntimeError(f"{node.name} is not a function")
+    # User-defined function
+    if node._plan_params is not func.params:
+        node._arg_plan = _arg_plan(node, func)
+        node._plan_params = func.params
+    func_env = Env(func.env, func.slot_index)
+    slots = func_env.slots
+    for is_ref, pname, slot, arg in node._arg_plan:
+        if is_ref:
+            # The referenced variable must already exist in the caller
+            env.get(arg)
+            val = Reference(env, arg)
         else:
-            raise RuntimeError(f"Unknown unary operator: {node.op}")
-    
-    elif isinstance(node, ArrayLiteral):
-        return [evaluate(x, env) for x in node.items]
-
-    elif isinstance(node, Index):
-        base = evaluate(node.base, env)
-        idx = evaluate(node.index, env)
-        if not isinstance(idx, int):
-            raise TypeError("Index must be integer")
-        return base[idx]
-    
-    elif isinstance(node, AssignIndex):
-        base = evaluate(node.base, env)
-        idx = evaluate(node.index, env)
-        expr_val = evaluate(node.expr, env)
-        if not isinstance(idx, int):
-            raise TypeError("Index must be integer")
-        base[idx] = expr_val
-        return None  # Assignment returns no value
-        
-    elif isinstance(node, Assignment):
-        value = evaluate(node.value, env)
-        # Set through Reference if needed
-        var = None
-        try:
-            var = env.get(node.name)
-        except Exception:
-            pass
-        if hasattr(var, 'set') and callable(var.set):
-            var.set(value)
+            val = arg(env)
+        if slot is not None:
+            slots[slot] = val
         else:
-            env.set(node.name, value)
-        return None  # Assignments return no value
-    
-    elif isinstance(node, FunctionDef):
-        # Store the function in the environment
-        func_value = FunctionValue(node.params, node.statements, env)
-        env.set(node.name, func_value)
-        return None  # Defining a function returns nothing
-    
-    elif isinstance(node, Call):
-        func = env.get(node.name)
-        args = [evaluate(arg, env) for arg in node.args]
-        # Built-in function (Python callable)
-        if callable(func) and not isinstance(func, FunctionValue):
-            return func(*args)
-        # User-defined function
-        if not isinstance(func, FunctionValue):
-            raise RuntimeError(f"{node.name} is not a function")
-        if len(node.args) != len(func.params):
-            raise RuntimeError(f"Function {node.name} expects {len(func.params)} arguments, got {len(node.args)}")
-        arg_values = []
-        for arg, (is_ref, pname) in zip(node.args, func.params):
-            if is_ref:
-                if isinstance(arg, Variable):
-                    arg_values.append(__import__('environment').Reference(env, arg.name))
-                else:
-                    raise RuntimeError("ref parameter needs a variable")
-            else:
-                val = evaluate(arg, env)
-                if hasattr(val, 'get') and callable(val.get):
-                    arg_values.append(val.get())
-                else:
-                    arg_values.append(val)
-        func_env = Env()
-        func_env.variables = env.variables.copy()
-        for (is_ref, pname), arg_val in zip(func.params, arg_values):
-            func_env.define(pname, arg_val)
-        result = None
+            func_env.define(pname, val)
+    result = None
+    try:
         for stmt in func.body:
-            if isinstance(stmt, ReturnValue):
-                return evaluate(stmt.value, func_env)
-            else:
-                result = evaluate(stmt, func_env)
-        return result
-    
-    elif isinstance(node, ReturnValue):
-        return evaluate(node.value, env)
+            result = evaluate(stmt, func_env)
+    except _Return as ret:
+        return ret.value
+    return result
+
+def _arg_plan(node, func):
+    """
+    Work out once how each argument of a call binds to func's parameters.
     
-    elif isinstance(node, Block):
-        result = None
-        for stmt in node.statements:
-            result = evaluate(stmt, env)
-        return result  # Last statement result
+    Returns:
+        list: (is_ref, param name, slot or None, variable name for ref
+        parameters / compiled argument otherwise) per parameter
+    """
+    if len(node.args) != len(func.params):
+        raise RuntimeError(f"Function {node.name} expects {len(func.params)} arguments, got {len(node.args)}")
+    plan = []
+    for arg, (is_ref, pname) in zip(node.args, func.params):
+        slot = func.slot_index.get(pname) if func.slot_index is not None else None
+        if is_ref:
+            if not isinstance(arg, Variable):
+                raise RuntimeError("ref parameter needs a variable")
+            plan.append((True, pname, slot, arg.name))
+        else:
+            plan.append((False, pname, slot, _compile(arg)))
+    return plan
+
+def _eval_return_value(node, env):
+    raise _Return(evaluate(node.value, env))
+
+def _eval_block(node, env):
+    stmts = node.statements
+    if not stmts:
+        return None
+    if len(stmts) == 1:
+        return evaluate(stmts[0], env)
+    for stmt in stmts:
+        result = evaluate(stmt, env)
+    return result  # Last statement result
+
+# Closure factories for variable <op> constant with the operator written
+# inline, which CPython can specialize for the operand types it sees
+# (int + int, int < int, ...) instead of calling through operator.*
+_VAR_CONST_OPS = {
+    "+": lambda var, value: lambda env: _eval_variable(var, env) + value,
+    "-": lambda var, value: lambda env: _eval_variable(var, env) - value,
+    "*": lambda var, value: lambda env: _eval_variable(var, env) * value,
+    "<": lambda var, value: lambda env: _eval_variable(var, env) < value,
+    ">": lambda var, value: lambda env: _eval_variable(var, env) > value,
+    "<=": lambda var, value: lambda env: _eval_variable(var, env) <= value,
+    ">=": lambda var, value: lambda env: _eval_variable(var, env) >= value,
+    "==": lambda var, value: lambda env: _eval_variable(var, env) == value,
+}
+
+def _compile(node):
+    """
+    Turn an AST node into a closure taking only env, so a hot loop skips
+    evaluate()'s dispatch. Nodes without a specialized closure call their
+    handler directly.
     
-    else:
-        raise RuntimeError(f"Unknown AST node: {type(node)}")
+    Args:
+        node: AST node to compile
+        
+    Returns:
+        callable: fn(env) returning what evaluate(node, env) would
+    """
+    node_type = type(node)
+    if node_type is Number or node_type is String:
+        value = node.value
+        return lambda env: value
+    if node_type is BinOp:
+        fn = BINOPS.get(node.op) or LOGIC_OPS.get(node.op)
+        if fn is None:
+            raise RuntimeError(f"Unknown operator: {node.op}")
+        # Typical conditions: variable <op> constant, variable <op> variable
+        if type(node.left) is Variable:
+            var = node.left
+            if type(node.right) is Number:
+                value = node.right.value
+                inline = _VAR_CONST_OPS.get(node.op)
+                if inline is not None:
+                    return inline(var, value)
+                return lambda env: fn(_eval_variable(var, env), value)
+            if type(node.right) is Variable:
+                other = node.right
+                return lambda env: fn(_eval_variable(var, env), _eval_variable(other, env))
+        left = _compile(node.left)
+        right = _compile(node.right)
+        return lambda env: fn(left(env), right(env))
+    handler = _DISPATCH.get(node_type)
+    if handler is None:
+        return lambda env: evaluate(node, env)
+    return lambda env: handler(node, env)
+
+# Node type -> handler; one dict lookup replaces the isinstance cascade.
+_DISPATCH = {
+    Number: _eval_number,
+    String: _eval_string,
+    Variable: _eval_variable,
+    BinOp: _eval_binop,
+    While: _eval_while,
+    If: _eval_if,
+    UnaryOp: _eval_unaryop,
+    ArrayLiteral: _eval_array_literal,
+    Index: _eval_index,
+    AssignIndex: _eval_assign_index,
+    Assignment: _eval_assignment,
+    InPlaceOp: _eval_inplace_op,
+    FunctionDef: _eval_function_def,
+    Call: _eval_call,
+    ReturnValue: _eval_return_value,
+    Block: _eval_block,
+}
+
+# Element types a flat list can be printed with map(str, ...)
+_SCALAR_TYPES = (int, float, str, bool)
 
 def _to_str(val):
     if isinstance(val, list):
+        # Flat list of one scalar type: no per-element recursion
+        if val and type(val[0]) in _SCALAR_TYPES:
+            first = type(val[0])
+            if all(type(x) is first for x in val):
+                return "[" + ", ".join(map(str, val)) + "]"
         return "[" + ", ".join(_to_str(x) for x in val) + "]"
     return str(val)
 
@@ -193,7 +358,7 @@ def gambl_len(x):
 
 def repl():
     """Interactive loop."""
-    from parser import parse
+    from parser import parse_program
     
     env = Env()
     env.set("len", gambl_len)
@@ -208,14 +373,10 @@ def repl():
             if not line:
                 continue
 
-            # Split on semicolons
-            statements = line.split(";")
+            # Parse the whole line once, then run each top-level statement
             result = None
-            for stmt in statements:
-                stmt = stmt.strip()
-                if stmt:
-                    ast = parse(stmt)
-                    result = evaluate(ast, env)
+            for ast in parse_program(line):
+                result = evaluate(ast, env)
             
             if result is not None:
                 print(result)
@@ -1,33 +1,60 @@
 # Gambl/Parser.py
 # Parsing Logic - Converts tokens to Abstract Syntax Tree
-from ast_nodes import Number, Variable, BinOp, UnaryOp, Assignment, If, While, FunctionDef, Call, FunctionValue, ReturnValue, Block, ArrayLiteral, Index, AssignIndex, String
-from lexer import lex
+import sys
+from ast_nodes import Number, Variable, BinOp, Assignment, If, While, FunctionDef, Call, ReturnValue, Block, ArrayLiteral, Index, AssignIndex, String
+from lexer import token_columns, describe, T, Token, KIND_NAMES
+import optimizer
+
+# The lexer interns operator text, so this is the string the token holds
+_POW = sys.intern("^")  # compared by identity
+
+# Binary operator precedence, loosest first; '^' is handled by parse_power
+_PREC_OR = 1
+_PREC_AND = 2
+_PREC_EQ = 3
+_PREC_CMP = 4
+_PREC_ADD = 5
+_PREC_MUL = 6
+
+# Token kind -> precedence; 0 for anything that isn't a binary operator
+_PREC = [0] * (max(KIND_NAMES) + 1)
+for _kind, _prec in (
+    (T.OR, _PREC_OR), (T.AND, _PREC_AND), (T.EQ, _PREC_EQ),
+    (T.LT, _PREC_CMP), (T.GT, _PREC_CMP), (T.LE, _PREC_CMP), (T.GE, _PREC_CMP),
+    (T.PLUS, _PREC_ADD), (T.MINUS, _PREC_ADD),
+    (T.MUL, _PREC_MUL), (T.DIV, _PREC_MUL), (T.MOD, _PREC_MUL),
+):
+    _PREC[_kind] = _prec
 
 class Parser:
     """
     Recursive descent parser for the Gambl language.
     Converts a stream of tokens into an Abstract Syntax Tree (AST).
     """
+    __slots__ = ('kinds', 'vals', 'i', 'optimize')
     
-    def __init__(self):
-        self.tokens = []
-        self.i = 0  # cursor into tokens
+    def __init__(self, optimize=True):
+        # Token kinds and values as parallel tuples, ending in EOF padding
+        self.kinds = (T.EOF,)
+        self.vals = ("",)
+        self.i = 0  # index of the current token
+        self.optimize = optimize  # run AST rewrites after parsing
     
     def at_eof(self):
         """Check if we've reached the end of the token stream."""
-        return self.i >= len(self.tokens)
+        return self.kinds[self.i] == T.EOF
 
     def current(self):
-        """Get the current token without consuming it."""
-        return self.tokens[self.i] if not self.at_eof() else ("EOF", "")
+        """Get the current token without consuming it (for error messages)."""
+        return Token(self.kinds[self.i], self.vals[self.i])
 
     def peek_kind(self):
         """Get the type of the current token."""
-        return self.current()[0]
+        return self.kinds[self.i]
 
     def peek_val(self):
         """Get the value of the current token."""
-        return self.current()[1]
+        return self.vals[self.i]
     
     def check(self, kind):
         """Return True if the current token is of the given kind."""
@@ -46,7 +73,7 @@ class Parser:
 
     def advance(self):
         """Move to the next token."""
-        if not self.at_eof(): 
+        if self.kinds[self.i] != T.EOF:
             self.i += 1
 
     def eat_kind(self, name):
@@ -54,19 +81,20 @@ class Parser:
         Consume a token of a specific type.
         
         Args:
-            name (str): Expected token type
+            name (int): Expected token type (a T constant)
             
         Returns:
-            tuple: The consumed token
+            str: The consumed token's value
             
         Raises:
             SyntaxError: If the current token doesn't match the expected type
         """
-        if self.peek_kind() == name:
-            token = self.current()
-            self.advance()
-            return token
-        raise SyntaxError(f"expected kind {name!r}, got {self.current()!r}")
+        i = self.i
+        if self.kinds[i] == name:
+            # Matched a real token, so there is no EOF check to make
+            self.i = i + 1
+            return self.vals[i]
+        self._raise_kind(name)
 
     def eat_val(self, pat):
         """
@@ -76,223 +104,187 @@ class Parser:
             pat (str): Expected token value
             
         Returns:
-            tuple: The consumed token
+            str: The consumed token's value
             
         Raises:
             SyntaxError: If the current token doesn't match the expected value
         """
-        if self.peek_val() == pat:
-            token = self.current()
-            self.advance()
-            return token
-        raise SyntaxError(f"expected {pat!r}, got {self.current()!r}")
-
-    def parse_call(self):
-        """Parse a function call if the current position looks like one."""
-        if self.peek_kind() == "ID":
-            # Look ahead to see if this is a function call
-            if (not self.at_eof() and 
-                self.i + 1 < len(self.tokens) and 
-                self.tokens[self.i + 1][1] == "("):
-                
-                name = self.eat_kind("ID")[1]
-                self.eat_val("(")
-                args = []
-                if self.peek_val() != ")":
-                    args.append(self.parse_expr())
-                    while self.peek_val() == ",":
-                        self.eat_val(",")
-                        args.append(self.parse_expr())
-                self.eat_val(")")
-                return Call(name, args)
-        return None
+        i = self.i
+        if self.vals[i] == pat:
+            self.i = i + 1
+            return self.vals[i]
+        self._raise_val(pat)
 
-    def parse_factor(self):
-        # Number literal
-        if self.peek_kind() == "NUM":
-            return Number(self.eat_kind("NUM")[1])
-        # String literal
-        if self.peek_kind() == "STRING":
-            return String(self.eat_kind("STRING")[1][1:-1])
-        # Array literal
-        if self.peek_kind() == "LBRACK":
-            self.eat_kind("LBRACK")
-            items = []
-            if self.peek_kind() != "RBRACK":
-                items.append(self.parse_expr())
-                while self.peek_kind() == "COMMA":
-                    self.eat_kind("COMMA")
-                    items.append(self.parse_expr())
-            self.eat_kind("RBRACK")
-            return ArrayLiteral(items)
-        # Function call or variable
-        if self.peek_kind() == "ID":
-            if (not self.at_eof() and
-                self.i + 1 < len(self.tokens) and
-                self.tokens[self.i + 1][0] == "LPAREN"):
-                name = self.eat_kind("ID")[1]
-                self.eat_kind("LPAREN")
-                args = []
-                if self.peek_kind() != "RPAREN":
-                    args.append(self.parse_expr())
-                    while self.peek_kind() == "COMMA":
-                        self.eat_kind("COMMA")
-                        args.append(self.parse_expr())
-                self.eat_kind("RPAREN")
-                return Call(name, args)
-            return Variable(self.eat_kind("ID")[1])
-        # Parentheses for grouping
-        if self.peek_kind() == "LPAREN":
-            self.eat_kind("LPAREN")
-            expr = self.parse_expr()
-            self.eat_kind("RPAREN")
-            return expr
-        raise SyntaxError(f"Unexpected token: {self.current()}")
+    # Error paths kept out of eat_kind/eat_val so the happy path stays short
+    def _raise_kind(self, name):
+        raise SyntaxError(f"expected kind {KIND_NAMES[name]!r}, got {describe(self.current())}")
 
-    def parse_power(self):
-        node = self.parse_factor()
-        while self.peek_kind() == "LBRACK":
-            self.eat_kind("LBRACK")
-            index = self.parse_expr()
-            self.eat_kind("RBRACK")
-            node = Index(node, index)
-        if self.peek_val() == "^":
-            op = self.eat_val("^")[1]
-            right = self.parse_power()
-            return BinOp(node, op, right)
-        return node
+    def _raise_val(self, pat):
+        raise SyntaxError(f"expected {pat!r}, got {describe(self.current())}")
 
-    def parse_term(self):
-        """Parse multiplication, division, and modulo."""
-        node = self.parse_power()
-        while self.peek_val() in ("*", "/", "%"):
-            op = self.eat_val(self.peek_val())[1]
-            right = self.parse_power()
-            node = BinOp(node, op, right)
-        return node
+    def parse_factor(self):
+        handler = _FACTOR_HANDLERS.get(self.kinds[self.i])
+        if handler is None:
+            raise SyntaxError(f"Unexpected token: {describe(self.current())}")
+        return handler(self)
 
-    def parse_expr(self):
-        """Parse addition and subtraction."""
-        node = self.parse_term()
-        while self.peek_val() in ("+", "-"):
-            op = self.eat_val(self.peek_val())[1]
-            right = self.parse_term()
-            node = BinOp(node, op, right)
-        return node
+    def _num_factor(self):
+        # Number literal
+        return Number(self.eat_kind(T.NUM))
+
+    def _string_factor(self):
+        # String literal
+        return String(self.eat_kind(T.STRING)[1:-1])
 
     def parse_array(self):
+        """Parse an array literal: [expr, expr, ...]."""
+        self.eat_kind(T.LBRACK)
         items = []
-        self.expect('LBRACK')
-        if not self.check('RBRACK'):
-            items.append(self.parse_expr())
-            while self.match('COMMA'):
-                items.append(self.parse_expr())
-        self.expect('RBRACK')
+        if self.peek_kind() != T.RBRACK:
+            append = items.append
+            parse_binary = self.parse_binary
+            append(parse_binary(_PREC_ADD))
+            while self.peek_kind() == T.COMMA:
+                self.eat_kind(T.COMMA)
+                append(parse_binary(_PREC_ADD))
+        self.eat_kind(T.RBRACK)
         return ArrayLiteral(items)
-    
+
+    def _id_factor(self):
+        # Function call or variable
+        if self.kinds[self.i + 1] == T.LPAREN:
+            name = self.eat_kind(T.ID)
+            self.eat_kind(T.LPAREN)
+            args = []
+            if self.peek_kind() != T.RPAREN:
+                append = args.append
+                parse_binary = self.parse_binary
+                append(parse_binary(_PREC_ADD))
+                while self.peek_kind() == T.COMMA:
+                    self.eat_kind(T.COMMA)
+                    append(parse_binary(_PREC_ADD))
+            self.eat_kind(T.RPAREN)
+            return Call(name, args)
+        return Variable(self.eat_kind(T.ID))
+
+    def _paren_factor(self):
+        # Parentheses for grouping
+        self.eat_kind(T.LPAREN)
+        expr = self.parse_binary(_PREC_ADD)
+        self.eat_kind(T.RPAREN)
+        return expr
+
     def parse_index(self, base):
-        self.expect('LBRACK')
-        index = self.parse_expr()
-        self.expect('RBRACK')
+        """Parse one [expr] subscript applied to base."""
+        self.eat_kind(T.LBRACK)
+        index = self.parse_binary(_PREC_ADD)
+        self.eat_kind(T.RBRACK)
         return Index(base, index)
 
-    def parse_comparison(self):
-        """Parse comparison operators."""
-        node = self.parse_expr()
-        while self.peek_kind() in ("LT", "GT", "LE", "GE"):
-            if self.peek_kind() == "LT":
-                op = self.eat_kind("LT")[1]
-            elif self.peek_kind() == "GT":
-                op = self.eat_kind("GT")[1]
-            elif self.peek_kind() == "LE":
-                op = self.eat_kind("LE")[1]
-            elif self.peek_kind() == "GE":
-                op = self.eat_kind("GE")[1]
-            right = self.parse_expr()  # ✅ FIXED
-            node = BinOp(node, op, right)
-        return node
-
-    def parse_equality(self):
-        """Parse equality operators."""
-        node = self.parse_comparison()
-        while self.peek_kind() == "EQ":
-            op = self.eat_kind("EQ")[1]
-            right = self.parse_comparison()
-            node = BinOp(node, op, right)
+    def parse_power(self):
+        """Parse exponentiation, which is right-associative."""
+        node = self._indexed_factor()
+        if self.vals[self.i] is not _POW:
+            return node
+        # Collect a ^ b ^ c ... then fold from the right, without recursing
+        operands = [node]
+        while self.vals[self.i] is _POW:
+            self.i += 1
+            operands.append(self._indexed_factor())
+        node = operands.pop()
+        while operands:
+            node = BinOp(operands.pop(), _POW, node)
         return node
 
-    def parse_and(self):
-        """Parse logical AND."""
-        node = self.parse_equality()
-        while self.peek_kind() == "AND":
-            op = self.eat_kind("AND")[1]
-            right = self.parse_equality()
-            node = BinOp(node, op, right)
+    def _indexed_factor(self):
+        # A factor followed by any number of [expr] subscripts
+        node = self.parse_factor()
+        while self.kinds[self.i] == T.LBRACK:
+            node = self.parse_index(node)
         return node
 
-    def parse_or(self):
-        """Parse logical OR."""
-        node = self.parse_and()
-        while self.peek_kind() == "OR":
-            op = self.eat_kind("OR")[1]
-            right = self.parse_and()
+    def parse_binary(self, min_prec):
+        """
+        Parse a chain of binary operators by precedence climbing, taking
+        only operators that bind at least as tightly as min_prec. One loop
+        covers every level from 'or' down to '*', so an operand costs a
+        single frame here rather than one per precedence level.
+        
+        Args:
+            min_prec (int): Lowest precedence to accept (a _PREC_* constant)
+            
+        Returns:
+            AST node for the expression
+        """
+        kinds = self.kinds
+        vals = self.vals
+        node = self.parse_power()
+        prec = _PREC[kinds[self.i]]
+        while prec >= min_prec:
+            i = self.i
+            op = vals[i]
+            self.i = i + 1  # op is a real token, so no EOF check
+            # All of these operators are left-associative
+            right = self.parse_binary(prec + 1)
             node = BinOp(node, op, right)
+            prec = _PREC[kinds[self.i]]
         return node
 
     def parse_if(self):
         """Parse if-then-else statements."""
-        if self.peek_kind() == "IF":
-            self.eat_kind("IF")
-            condition = self.parse_or()
+        if self.peek_kind() == T.IF:
+            self.eat_kind(T.IF)
+            condition = self.parse_binary(_PREC_OR)
             then_branch = None
             else_branch = None
-            if self.peek_kind() == "THEN":
-                self.eat_kind("THEN")
+            if self.peek_kind() == T.THEN:
+                self.eat_kind(T.THEN)
                 then_branch = self.parse_statement()
-            if self.peek_kind() == "ELSE":
-                self.eat_kind("ELSE")
+            if self.peek_kind() == T.ELSE:
+                self.eat_kind(T.ELSE)
                 else_branch = self.parse_statement()
             return If(condition, then_branch, else_branch)
         else:
-            return self.parse_or()
+            return self.parse_binary(_PREC_OR)
 
     def parse_assignment(self):
         # Assignment: a = value or a[expr] = value
-        if (self.peek_kind() == "ID" and
-            not self.at_eof() and
-            self.i + 1 < len(self.tokens) and
-            self.tokens[self.i + 1][0] == "ASSIGN"):
-            name = self.eat_kind("ID")[1]
-            self.eat_kind("ASSIGN")
-            value = self.parse_while()
-            return Assignment(name, value)
-        # Index assignment: a[expr][expr]... = value
-        elif (self.peek_kind() == "ID" and
-            not self.at_eof() and
-            self.i + 1 < len(self.tokens) and
-            self.tokens[self.i + 1][0] == "LBRACK"):
-            # Parse the full left-hand side as an expression (with all chained indexing)
-            lhs = self.parse_expr()
-            if self.peek_kind() == "ASSIGN":
-                self.eat_kind("ASSIGN")
-                expr = self.parse_while()
-                # Unpack the left-hand side to get the base and all indices
-                # Only support AssignIndex for a single index for now
-                if isinstance(lhs, Index):
-                    return AssignIndex(lhs.base, lhs.index, expr)
+        kinds = self.kinds
+        i = self.i
+        if kinds[i] == T.ID:
+            # The EOF padding makes kinds[i + 1] safe without a bounds check
+            next_kind = kinds[i + 1]
+            if next_kind == T.ASSIGN:
+                # Both tokens are already known, so step over them directly
+                name = self.vals[i]
+                self.i = i + 2
+                value = self.parse_while()
+                return Assignment(name, value)
+            # Index assignment: a[expr][expr]... = value
+            if next_kind == T.LBRACK:
+                # Parse the full left-hand side as an expression (with all chained indexing).
+                # It is parsed once either way: without '=' it is returned as the
+                # statement itself, so nothing is re-parsed and no memo is needed.
+                lhs = self.parse_binary(_PREC_ADD)
+                if self.peek_kind() == T.ASSIGN:
+                    self.eat_kind(T.ASSIGN)
+                    expr = self.parse_while()
+                    # Unpack the left-hand side to get the base and all indices
+                    # Only support AssignIndex for a single index for now
+                    if type(lhs) is Index:
+                        return AssignIndex(lhs.base, lhs.index, expr)
+                    else:
+                        raise SyntaxError("Invalid assignment target")
                 else:
-                    raise SyntaxError("Invalid assignment target")
-            else:
-                return lhs
-        else:
-            return self.parse_if()
+                    return lhs
+        return self.parse_if()
 
     def parse_while(self):
         """Parse while loops."""
-        if self.peek_kind() == "WHILE":
-            self.eat_kind("WHILE")
-            condition = self.parse_comparison()
-            self.eat_kind("COLON")
+        if self.peek_kind() == T.WHILE:
+            self.eat_kind(T.WHILE)
+            condition = self.parse_binary(_PREC_CMP)
+            self.eat_kind(T.COLON)
             body = self.parse_statement()
             return While(condition, body)
         else:
@@ -300,86 +292,72 @@ class Parser:
 
     def parse_return(self):
         """Parse return statements."""
-        if self.peek_kind() == "RETURN":
-            self.eat_kind("RETURN")
-            value = self.parse_or()
+        if self.peek_kind() == T.RETURN:
+            self.eat_kind(T.RETURN)
+            value = self.parse_binary(_PREC_OR)
             return ReturnValue(value)
         else:
             return self.parse_while()
 
     def parse_function_def(self):
         # Parse a function definition, supporting 'ref' parameter mode
-        if self.peek_kind() == "DEF":
-            self.eat_kind("DEF")
-            name = self.eat_kind("ID")[1]
+        if self.peek_kind() == T.DEF:
+            self.eat_kind(T.DEF)
+            name = self.eat_kind(T.ID)
             self.eat_val("(")
             params = []
+            append = params.append
             while self.peek_val() != ")":
                 is_ref = False
-                if self.peek_kind() == "REF":
-                    self.eat_kind("REF")
+                if self.peek_kind() == T.REF:
+                    self.eat_kind(T.REF)
                     is_ref = True
-                param_name = self.eat_kind("ID")[1]
-                params.append((is_ref, param_name))
+                param_name = self.eat_kind(T.ID)
+                append((is_ref, param_name))
                 if self.peek_val() == ",":
                     self.eat_val(",")
                 else:
                     break
             self.eat_val(")")
-            self.eat_kind("COLON")
+            self.eat_kind(T.COLON)
             # Parse function body (could be multiple statements)
             statements = []
-            if self.peek_kind() == "RETURN":
-                statements.append(self.parse_return())
-            else:
-                statements.append(self.parse_assignment())
-            while self.peek_val() == ";":
-                next_pos = self.i + 1
-                if next_pos < len(self.tokens):
-                    next_token = self.tokens[next_pos]
-                    if next_token[0] == "DEF":
-                        break
-                    elif (next_token[0] == "ID" and 
-                          next_pos + 1 < len(self.tokens) and 
-                          self.tokens[next_pos + 1][1] == "("):
-                        break
-                    else:
-                        self.eat_val(";")
-                        if not self.at_eof() and self.peek_kind() != "EOF":
-                            if self.peek_kind() == "RETURN":
-                                statements.append(self.parse_return())
-                            else:
-                                statements.append(self.parse_assignment())
-                        else:
-                            break
+            while True:
+                if self.peek_kind() == T.RETURN:
+                    statements.append(self.parse_return())
                 else:
+                    statements.append(self.parse_assignment())
+                if self.peek_val() != ";" or self._at_func_boundary():
                     break
+                self.eat_val(";")
             return FunctionDef(name, params, statements)
         else:
             return self.parse_return()
 
+    def _at_func_boundary(self):
+        """
+        Check whether the token after the current ';' ends a function body:
+        end of input, another definition, or a call at the top level.
+        """
+        i = self.i
+        kind = self.kinds[i + 1]
+        return kind == T.EOF or kind == T.DEF or (kind == T.ID and self.vals[i + 2] == "(")
+
     def parse_statement(self):
         """Parse any statement type."""
-        if self.peek_kind() == "DEF":
-            return self.parse_function_def()
-        elif self.peek_kind() == "RETURN":
-            return self.parse_return()
-        elif self.peek_kind() == "WHILE":
-            return self.parse_while()
-        else:
-            return self.parse_assignment()
+        return _STMT_HANDLERS.get(self.kinds[self.i], Parser.parse_assignment)(self)
 
-    def parse(self, src):
+    def parse_program(self, src):
         """
-        Parse source code into an AST.
+        Parse source code into its top-level statements.
         
         Args:
             src (str): Source code to parse
             
         Returns:
-            AST node representing the parsed code
+            list: AST node for each top-level statement, in order
         """
-        self.tokens = list(lex(src))
+        self.kinds, self.vals = token_columns(src)
         self.i = 0
         
         statements = []
@@ -393,22 +371,68 @@ class Parser:
             else:
                 break
         
+        if self.optimize:
+            statements = [optimizer.optimize(tree) for tree in statements]
+        return statements
+
+    def parse(self, src):
+        """
+        Parse source code into an AST.
+        
+        Args:
+            src (str): Source code to parse
+            
+        Returns:
+            AST node representing the parsed code
+        """
+        statements = self.parse_program(src)
+        
         # Return Block if multiple statements, single statement otherwise
         if len(statements) == 1:
             return statements[0]
-        else:
-            return Block(statements)
+        return Block(statements)
+
+# Token kind -> unbound parse method, for the kinds that pick a rule. Built
+# once here rather than per instance, and called with the parser as self.
+_STMT_HANDLERS = {
+    T.DEF: Parser.parse_function_def,
+    T.RETURN: Parser.parse_return,
+    T.WHILE: Parser.parse_while,
+}
+_FACTOR_HANDLERS = {
+    T.NUM: Parser._num_factor,
+    T.STRING: Parser._string_factor,
+    T.LBRACK: Parser.parse_array,
+    T.ID: Parser._id_factor,
+    T.LPAREN: Parser._paren_factor,
+}
 
 # Convenience function for external use
-def parse(src):
+def parse(src, optimize=True):
     """
     Parse source code into an AST using a new parser instance.
     
     Args:
         src (str): Source code to parse
+        optimize (bool): Apply AST rewrites (disable for A/B testing)
         
     Returns:
         AST node representing the parsed code
     """
-    parser = Parser()
+    parser = Parser(optimize)
     return parser.parse(src)
+
+def parse_program(src, optimize=True):
+    """
+    Parse source code into a list of top-level statements using a new
+    parser instance.
+    
+    Args:
+        src (str): Source code to parse
+        optimize (bool): Apply AST rewrites (disable for A/B testing)
+        
+    Returns:
+        list: AST node for each top-level statement
+    """
+    parser = Parser(optimize)
+    return parser.parse_program(src)
@@ -2,8 +2,11 @@
 # AST node classes for the interpreter. These are just simple containers.
 
 class Number:
+    __slots__ = ('value',)
     def __init__(self, value):
-        if '.' in value:
+        if not isinstance(value, str):
+            self.value = value  # Already a number (e.g. a folded constant)
+        elif '.' in value:
             self.value = float(value)
         else:
             self.value = int(value)
@@ -11,20 +14,29 @@ class Number:
         return f"Number({self.value})"
 
 class Variable:
+    __slots__ = ('name', 'slot', '_ic_env', '_ic_version', '_ic_scope')
     def __init__(self, name):
         self.name = name
+        self.slot = None  # Index into Env.slots when name is a function local
+        # Inline cache: the scope whose dict held name, valid for (env, version)
+        self._ic_env = None
+        self._ic_version = None
+        self._ic_scope = None
     def __repr__(self):
         return f"Variable({self.name!r})"
 
 class BinOp:
+    __slots__ = ('left', 'op', 'right', '_compiled')
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
+        self._compiled = None  # Closure built on first evaluation
     def __repr__(self):
         return f"BinOp({self.left}, {self.op!r}, {self.right})"
 
 class UnaryOp:
+    __slots__ = ('op', 'operand')
     def __init__(self, op, operand):
         self.op = op
         self.operand = operand
@@ -32,69 +44,88 @@ class UnaryOp:
         return f"UnaryOp({self.op!r}, {self.operand})"
 
 class Assignment:
+    __slots__ = ('name', 'value', 'slot', '_ic_env')
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.slot = None  # Index into Env.slots when name is a function local
+        self._ic_env = None  # Env whose dict is known to hold name
     def __repr__(self):
         return f"Assignment({self.name!r}, {self.value})"
 
 class If:
+    __slots__ = ('condition', 'then_branch', 'else_branch', '_cond')
     def __init__(self, condition, then_branch, else_branch=None):
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
+        self._cond = None  # Compiled condition, built on first evaluation
     def __repr__(self):
         return f"If({self.condition}, {self.then_branch}, {self.else_branch})"
 
 class While:
+    __slots__ = ('condition', 'body', '_compiled')
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
+        self._compiled = None  # (condition, body) closures, built on first run
     def __repr__(self):
         return f"While({self.condition}, {self.body})"
 
 class FunctionDef:
+    __slots__ = ('name', 'params', 'statements', 'slot_index')
     def __init__(self, name, params, statements):
         self.name = name
         self.params = params  # List of (is_ref, name) tuples
         self.statements = statements
+        self.slot_index = None  # Local name -> slot, filled in by the optimizer
     def __repr__(self):
         return f"FunctionDef({self.name!r}, {self.params}, {self.statements})"
     
 class Call:
+    __slots__ = ('name', 'args', '_arg_plan', '_plan_params')
     def __init__(self, name, args):
         self.name = name
         self.args = args
+        # Per-argument binding steps, valid while the callee's params are _plan_params
+        self._arg_plan = None
+        self._plan_params = None
     def __repr__(self):
         return f"Call({self.name!r}, {self.args})"
 
 class FunctionValue:
-    def __init__(self, params, statements, env):
+    __slots__ = ('params', 'body', 'env', 'slot_index')
+    def __init__(self, params, statements, env, slot_index=None):
         self.params = params  # List of (is_ref, name) tuples
         self.body = statements
         self.env = env
+        self.slot_index = slot_index  # Local name -> slot, or None
     def __repr__(self):
         return f"FunctionValue({self.params}, {self.body}, env)"
     
 class ReturnValue:
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
     def __repr__(self):
         return f"ReturnValue({self.value})"
 
 class Block:
+    __slots__ = ('statements',)
     def __init__(self, statements):
         self.statements = statements
     def __repr__(self):
         return f"Block({self.statements})"
     
 class ArrayLiteral:
+    __slots__ = ('items',)
     def __init__(self, items):
         self.items = items
     def __repr__(self):
         return f"ArrayLiteral({self.items})"
     
 class Index:
+    __slots__ = ('base', 'index')
     def __init__(self, base, index):
         self.base = base
         self.index = index
@@ -102,6 +133,7 @@ class Index:
         return f"Index({self.base}, {self.index})"
     
 class AssignIndex:
+    __slots__ = ('base', 'index', 'expr')
     def __init__(self, base, index, expr):
         self.base = base
         self.index = index
@@ -110,7 +142,19 @@ class AssignIndex:
         return f"AssignIndex({self.base}, {self.index}, {self.expr})"
 
 class String:
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
     def __repr__(self):
-        return f"String({self.value!r})"
\ No newline at end of file
+        return f"String({self.value!r})"
+
+class InPlaceOp:
+    __slots__ = ('name', 'op', 'value', 'slot', '_ic_env')
+    def __init__(self, name, op, value):
+        self.name = name
+        self.op = op
+        self.value = value  # Constant right-hand operand
+        self.slot = None  # Index into Env.slots when name is a function local
+        self._ic_env = None  # Env whose dict is known to hold name
+    def __repr__(self):
+        return f"InPlaceOp({self.name!r}, {self.op!r}, {self.value!r})"
@@ -1,4 +1,5 @@
 class Reference:
+    __slots__ = ('env', 'name')
     def __init__(self, env, name):
         self.env = env
         self.name = name
@@ -11,14 +12,23 @@ class Reference:
 # Gambl/environment.py
 # Environment and Scope Management
 
+# Marks a slot whose local has not been assigned yet
+UNBOUND = object()
+
 class Env:
     """
     Environment class for managing variable and function scopes.
     Handles variable storage, lookup, and assignment.
     """
+    __slots__ = ('variables', 'parent', 'version', 'slots', 'slot_index')
     
-    def __init__(self):
+    def __init__(self, parent=None, slot_index=None):
         self.variables = {}
+        self.parent = parent  # Enclosing scope, searched by get()
+        self.version = 0  # Bumped when a new name is added to variables
+        self.slot_index = slot_index  # Local name -> position in slots
+        # Values of resolved function locals
+        self.slots = [UNBOUND] * len(slot_index) if slot_index is not None else None
 
     def define(self, name, value):
         """
@@ -28,11 +38,16 @@ class Env:
             name (str): Variable name
             value: Variable value
         """
-        self.variables[name] = value
+        if self.slot_index is not None and name in self.slot_index:
+            self.slots[self.slot_index[name]] = value
+        else:
+            if name not in self.variables:
+                self.version += 1
+            self.variables[name] = value
 
     def get(self, name):
         """
-        Get a variable's value from this environment.
+        Get a variable's value from this environment or an enclosing one.
         
         Args:
             name (str): Variable name
@@ -43,34 +58,34 @@ class Env:
         Raises:
             NameError: If the variable is not defined
         """
-        if name in self.variables:
-            return self.variables[name]
-        else:
-            raise NameError(f"Undefined variable: {name}")
+        env = self
+        while env is not None:
+            slot_index = env.slot_index
+            if slot_index is not None and name in slot_index:
+                value = env.slots[slot_index[name]]
+                if value is not UNBOUND:
+                    return value
+            variables = env.variables
+            if name in variables:
+                return variables[name]
+            env = env.parent
+        raise NameError(f"Undefined variable: {name}")
         
     def set(self, name, value):
         """
-        Set a variable's value. Creates the variable if it doesn't exist.
+        Set a variable's value in this environment. Creates the variable
+        here if it doesn't exist, even if an enclosing scope defines it.
         
         Args:
             name (str): Variable name
             value: New value for the variable
         """
-        if name in self.variables:
+        if self.slot_index is not None and name in self.slot_index:
+            self.slots[self.slot_index[name]] = value
+        elif name in self.variables:
             self.variables[name] = value
         else:
             self.define(name, value)
             
-    def copy(self):
-        """
-        Create a shallow copy of this environment.
-        
-        Returns:
-            Env: A new environment with copied variables
-        """
-        new_env = Env()
-        new_env.variables = self.variables.copy()
-        return new_env
-        
     def __repr__(self):
         return f"Env({self.variables})"
\ No newline at end of file
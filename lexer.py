@@ -2,6 +2,56 @@
 # Tokenization and Lexical Analysis
 
 import re
+import sys
+from functools import lru_cache
+
+class T:
+    """Token kinds. Every Token.kind from lex() is one of these ints."""
+    EOF = 0
+    NUM = 1
+    STRING = 2
+    EQ = 3
+    LE = 4
+    GE = 5
+    LT = 6
+    GT = 7
+    AND = 8
+    OR = 9
+    NOT = 10
+    REF = 11
+    IF = 12
+    THEN = 13
+    ELSE = 14
+    WHILE = 15
+    DEF = 16
+    RETURN = 17
+    ID = 18
+    ASSIGN = 19
+    PLUS = 20
+    MINUS = 21
+    MUL = 22
+    DIV = 23
+    MOD = 24
+    POW = 25
+    LBRACK = 26
+    RBRACK = 27
+    LPAREN = 28
+    RPAREN = 29
+    COMMA = 30
+    COLON = 31
+    SEMICOLON = 32
+
+# Token kind -> its name, for error messages
+KIND_NAMES = {kind: name for name, kind in vars(T).items() if name.isupper()}
+
+class Token:
+    """A lexed token: its kind (a T constant) and source text."""
+    __slots__ = ('kind', 'val')
+    def __init__(self, kind, val):
+        self.kind = kind
+        self.val = val
+    def __repr__(self):
+        return f"Token({KIND_NAMES[self.kind]}, {self.val!r})"
 
 # Token specification
 SPEC = [
@@ -12,17 +62,7 @@ SPEC = [
     ("GE", r">="),
     ("LT", r"<"),
     ("GT", r">"),
-    ("AND", r"and\b"),
-    ("OR", r"or\b"),
-    ("NOT", r"not\b"),
-    ("REF", r"ref\b"),
-    ("IF", r"if\b"),
-    ("THEN", r"then\b"),
-    ("ELSE", r"else\b"),
-    ("WHILE", r"while\b"),
-    ("DEF", r"def\b"),
-    ("RETURN", r"return\b"),
-    ("ID",  r"[A-Za-z_]\w*"),
+    ("ID",  r"[A-Za-z_]\w*"),  # Keywords are split out by _KEYWORDS
     ("ASSIGN", r"="),
     ("PLUS", r"\+"),
     ("MINUS", r"-"),
@@ -42,51 +82,128 @@ SPEC = [
     ("MISMATCH", r"."),
 ]
 
-# Compile the master regex pattern
-MASTER = re.compile("|".join(f"(?P<{name}>{pat})" for name, pat in SPEC))
+# Identifiers that are keywords, matched as ID and then looked up here
+_KEYWORDS = {
+    "and": T.AND,
+    "or": T.OR,
+    "not": T.NOT,
+    "ref": T.REF,
+    "if": T.IF,
+    "then": T.THEN,
+    "else": T.ELSE,
+    "while": T.WHILE,
+    "def": T.DEF,
+    "return": T.RETURN,
+}
+
+# Compile the master regex pattern. Leading whitespace is folded into each
+# match, so whitespace between tokens costs no match of its own. The grammar
+# is ASCII, so \d and \w are too.
+MASTER = re.compile(r"[ \t\r\n]*(?:" + "|".join(f"(?P<{name}>{pat})" for name, pat in SPEC) + ")", re.ASCII)
+
+# Group number -> token kind; None for WS, COMMENT, MISMATCH and inner groups.
+# The named group always closes last, so Match.lastindex is its number.
+_KIND_AT = [None] * (MASTER.groups + 1)
+for _name, _index in MASTER.groupindex.items():
+    _KIND_AT[_index] = getattr(T, _name, None)
+_MISMATCH = MASTER.groupindex["MISMATCH"]
+_LAST_LITERAL = T.STRING  # kinds up to here carry literal text
 
 def lex(src):
     """
-    Tokenize source code into a sequence of (token_type, token_value) tuples.
+    Tokenize source code into a sequence of Tokens.
     
     Args:
         src (str): Source code to tokenize
         
     Yields:
-        tuple: (token_type, token_value) pairs
+        Token: the next token
         
     Raises:
         ValueError: If an unexpected character is encountered
     """
+    for kind, text in _scan(src):
+        yield Token(kind, text)
+
+def _scan(src):
+    """Yield (kind, text) for each token in src; lex() without the Token wrapper."""
+    id_kind = T.ID
+    intern = sys.intern
     for m in MASTER.finditer(src):
-        kind = m.lastgroup
-        text = m.group()
+        index = m.lastindex
+        kind = _KIND_AT[index]
+        text = m[index]
         
-        # Skip whitespace and comments
-        if kind == "WS" or kind == "COMMENT":
+        if kind is None:
+            # Report unexpected characters
+            if index == _MISMATCH:
+                raise ValueError(f"Unexpected character: {text!r} at index {m.start(index)}")
+            # Skip whitespace and comments
             continue
-            
-        # Report unexpected characters
-        if kind == "MISMATCH":
-            raise ValueError(f"Unexpected character: {text!r} at index {m.start()}")
-            
-        yield (kind, text)
+        
+        if kind == id_kind:
+            kind = _KEYWORDS.get(text, id_kind)
+        # Names, keywords and operators come out interned, so the parser
+        # can compare them by identity; literals are left alone
+        if kind > _LAST_LITERAL:
+            text = intern(text)
+        yield kind, text
+
+def describe(token):
+    """
+    Format a token for error messages, with its kind spelled out.
+    
+    Args:
+        token (Token): Token to describe
+        
+    Returns:
+        str: e.g. "('ID', 'x')"
+    """
+    return repr((KIND_NAMES[token.kind], token.val))
 
 def tokenize(src):
     """
-    Convenience function that returns a list of all tokens.
+    Tokenize source code into a tuple of Tokens.
+    
+    Args:
+        src (str): Source code to tokenize
+        
+    Returns:
+        tuple: All Tokens in src
+    """
+    return tuple(lex(src))
+
+# Padding after the last token, enough for a parser to look two tokens ahead
+_EOF_PAD = 3
+
+@lru_cache(maxsize=1024)
+def token_columns(src):
+    """
+    Tokenize source code into parallel kind and value tuples, padded with
+    EOF entries so lookahead never needs a bounds check.
+    Callers must not modify the returned tuples.
     
     Args:
         src (str): Source code to tokenize
         
     Returns:
-        list: List of (token_type, token_value) tuples
+        tuple: (kinds, vals) for all tokens in src, then _EOF_PAD EOF tokens
     """
-    return list(lex(src))
+    # Fill both columns as the scanner goes, so no list of pairs is kept
+    kinds = []
+    vals = []
+    add_kind = kinds.append
+    add_val = vals.append
+    for kind, text in _scan(src):
+        add_kind(kind)
+        add_val(text)
+    kinds.extend([T.EOF] * _EOF_PAD)
+    vals.extend([""] * _EOF_PAD)
+    return tuple(kinds), tuple(vals)
 
 if __name__ == "__main__":
     # Test the lexer
     test_code = "def add(x, y) : return x + y; add(2, 3)"
     tokens = tokenize(test_code)
     for token in tokens:
-        print(token)
\ No newline at end of file
+        print(describe(token))
\ No newline at end of file
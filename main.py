@@ -3,7 +3,7 @@
 
 import sys
 from environment import Env
-from parser import parse
+from parser import parse, parse_program
 from interpreter import evaluate
 
 def run_test_case(description, code, expected_result, env=None):
@@ -113,6 +113,8 @@ def run_all_tests():
         ("Function calling function", "def double(x) : return x * 2; def quadruple(x) : return double(double(x)); quadruple(3)", 12),
         ("Function with closure", "y = 100; def add_y(x) : return x + y; add_y(5)", 105),
         ("Variable scope test", "x = 10; def test_scope(x) : return x + 1; test_scope(5); x", 10),
+        ("Return inside if ends the function", "def early(x) : if x < 0 then return 0 else y = 1; return 5; early(0 - 1)", 0),
+        ("Assignment inside function stays local", "x = 10; def g() : x = 99; return x; g(); x", 10),
 
         # --- New tests for reference semantics ---
         ("Call by VALUE does not update caller", "x = 10; def f(y) : y = y + 5; f(x); x", 10),
@@ -180,14 +182,10 @@ def repl():
             if not line:
                 continue
 
-            # Handle multiple statements separated by semicolons
-            statements = line.split(";")
+            # Parse the whole line once, then run each top-level statement
             result = None
-            for stmt in statements:
-                stmt = stmt.strip()
-                if stmt:
-                    ast = parse(stmt)
-                    result = evaluate(ast, env)
+            for ast in parse_program(line):
+                result = evaluate(ast, env)
             
             if result is not None:
                 print(result)
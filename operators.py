@@ -0,0 +1,25 @@
+# Gambl/operators.py
+# Binary operator semantics, shared by the interpreter and the optimizer
+
+import operator
+
+# Binary operators as plain functions
+BINOPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.floordiv,
+    "%": operator.mod,
+    "^": operator.pow,
+    "==": operator.eq,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+# Both operands are evaluated before "and"/"or" apply (no short-circuit)
+LOGIC_OPS = {
+    "and": lambda left, right: left and right,
+    "or": lambda left, right: left or right,
+}
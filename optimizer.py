@@ -0,0 +1,133 @@
+# Gambl/optimizer.py
+# AST rewrites applied after parsing
+
+from ast_nodes import Number, Variable, BinOp, UnaryOp, Assignment, If, While, FunctionDef, Call, ReturnValue, Block, ArrayLiteral, Index, AssignIndex, InPlaceOp, String
+from operators import BINOPS
+
+# Arithmetic operators, which may be fused into InPlaceOp (x = x <op> constant)
+_INPLACE_OPS = frozenset(("+", "-", "*", "/", "%", "^"))
+
+# Limits on folding a ^ b, so parsing never builds a huge number that the
+# program might not even compute at run time
+_MAX_POW_EXPONENT = 1024
+_MAX_POW_BITS = 4096
+
+def optimize(node):
+    """
+    Rewrite a parsed AST into a cheaper-to-evaluate equivalent.
+
+    Args:
+        node: AST node returned by the parser
+
+    Returns:
+        The rewritten AST node
+    """
+    node = _walk(node, _fold)
+    node = _walk(node, _fuse)
+    return _walk(node, _resolve)
+
+def _walk(node, rewrite):
+    """Rewrite the children of node bottom-up, then node itself."""
+    if node is None:
+        return None
+    for field in _children(node):
+        child = getattr(node, field)
+        if type(child) is list:
+            setattr(node, field, [_walk(item, rewrite) for item in child])
+        else:
+            setattr(node, field, _walk(child, rewrite))
+    return rewrite(node)
+
+# Fields holding child nodes, per node type; list fields hold several
+_CHILD_FIELDS = {
+    BinOp: ("left", "right"),
+    Assignment: ("value",),
+    Call: ("args",),
+    UnaryOp: ("operand",),
+    If: ("condition", "then_branch", "else_branch"),
+    While: ("condition", "body"),
+    Block: ("statements",),
+    FunctionDef: ("statements",),
+    ReturnValue: ("value",),
+    ArrayLiteral: ("items",),
+    Index: ("base", "index"),
+    AssignIndex: ("base", "index", "expr"),
+}
+
+def _children(node):
+    """Return the names of node's fields that hold child nodes."""
+    return _CHILD_FIELDS.get(type(node), ())
+
+def _fold(node):
+    """Replace arithmetic and comparisons on constant operands with the result."""
+    if type(node) is BinOp:
+        if (node.op in BINOPS and
+            type(node.left) is Number and
+            type(node.right) is Number):
+            if node.op == "^" and not _small_power(node.left.value, node.right.value):
+                return node  # Leave it to run at run time
+            try:
+                return Number(BINOPS[node.op](node.left.value, node.right.value))
+            except ArithmeticError:
+                return node  # Leave it to raise at run time
+    elif type(node) is UnaryOp:
+        if node.op == "-" and type(node.operand) is Number:
+            return Number(-node.operand.value)
+    return node
+
+def _small_power(base, exponent):
+    """Check whether base ^ exponent is cheap enough to compute while parsing."""
+    if isinstance(base, float) or isinstance(exponent, float):
+        return True  # Float powers take constant time (or overflow)
+    if abs(exponent) > _MAX_POW_EXPONENT:
+        return False
+    # An int result has about exponent * bits(base) bits
+    return abs(exponent) * abs(base).bit_length() <= _MAX_POW_BITS
+
+def _fuse(node):
+    """Collapse common statement shapes into single nodes."""
+    # x = x <op> constant  ->  InPlaceOp(x, op, constant)
+    if type(node) is Assignment:
+        value = node.value
+        if (type(value) is BinOp and
+            value.op in _INPLACE_OPS and
+            type(value.left) is Variable and
+            value.left.name == node.name and
+            type(value.right) is Number):
+            return InPlaceOp(node.name, value.op, value.right.value)
+    # A single-statement Block evaluates to that statement
+    elif type(node) is Block and len(node.statements) == 1:
+        return node.statements[0]
+    return node
+
+def _resolve(node):
+    """Give each function's parameters and assigned names a list slot."""
+    if type(node) is FunctionDef:
+        slot_index = {}
+        for is_ref, pname in node.params:
+            slot_index.setdefault(pname, len(slot_index))
+        for stmt in node.statements:
+            for sub in _scope_nodes(stmt):
+                if type(sub) in (Assignment, InPlaceOp, FunctionDef):
+                    slot_index.setdefault(sub.name, len(slot_index))
+        for stmt in node.statements:
+            for sub in _scope_nodes(stmt):
+                if type(sub) in (Variable, Assignment, InPlaceOp) and sub.name in slot_index:
+                    sub.slot = slot_index[sub.name]
+        node.slot_index = slot_index
+    return node
+
+def _scope_nodes(node):
+    """Yield node and its descendants, without entering nested function bodies."""
+    if node is None:
+        return
+    yield node
+    if type(node) is FunctionDef:
+        return
+    for field in _children(node):
+        child = getattr(node, field)
+        if type(child) is list:
+            for item in child:
+                yield from _scope_nodes(item)
+        else:
+            yield from _scope_nodes(child)
@@ -0,0 +1,25 @@
+# Gambl/setup.py
+# Optional Cython build of the interpreter core
+#
+#   python setup.py build_ext --inplace
+#
+# The compiled modules take precedence over the .py files of the same name.
+# Delete the generated .so/.pyd files to go back to pure Python.
+
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+setup(
+    name="gambl",
+    ext_modules=cythonize(
+        [
+            Extension("ast_nodes", ["ast_nodes.py"]),
+            Extension("environment", ["environment.py"]),
+            Extension("lexer", ["lexer.py"]),
+            # Imported as "interpreter" and "parser" (see main.py)
+            Extension("interpreter", ["Interpreter.py"]),
+            Extension("parser", ["Parser.py"]),
+        ],
+        compiler_directives={"language_level": "3"},
+    ),
+)
@@ -0,0 +1,18 @@
+import pytest
+from lexer import lex, token_columns, T
+
+def kinds_and_vals(src):
+    return [(token.kind, token.val) for token in lex(src)]
+
+def test_whitespace_and_comments_are_skipped():
+    src = "  x\t=  1 # set x\n\n  y  "
+    assert kinds_and_vals(src) == [(T.ID, "x"), (T.ASSIGN, "="), (T.NUM, "1"), (T.ID, "y")]
+
+def test_comment_only_source_has_no_tokens():
+    assert kinds_and_vals("# nothing here\n   # or here") == []
+    kinds, vals = token_columns("   # trailing")
+    assert all(kind == T.EOF for kind in kinds)
+
+def test_unexpected_character_reports_its_index():
+    with pytest.raises(ValueError, match=r"'\$' at index 6"):
+        list(lex("x =   $"))
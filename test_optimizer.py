@@ -0,0 +1,53 @@
+import pytest
+from ast_nodes import Number, BinOp, UnaryOp, Variable
+from interpreter import evaluate
+from optimizer import optimize, _small_power
+from parser import parse
+from environment import Env
+
+def test_folds_constant_arithmetic():
+    tree = parse("1 + 2 * 3")
+    print(f"\n[test_folds_constant_arithmetic] {tree}")
+    assert isinstance(tree, Number)
+    assert tree.value == 7
+
+def test_folds_constant_comparison():
+    tree = parse("if 2 * 3 < 7 then 1 else 0")
+    assert isinstance(tree.condition, Number)
+    assert tree.condition.value is True
+    assert evaluate(tree, Env()) == 1
+
+def test_comparison_with_huge_power_is_not_folded():
+    tree = parse("def f() : return 10 ^ 10 ^ 10 > 1")
+    comparison = tree.statements[0].value
+    assert isinstance(comparison, BinOp) and comparison.op == ">"
+    assert isinstance(comparison.left, BinOp) and comparison.left.op == "^"
+
+def test_folds_unary_minus():
+    tree = optimize(UnaryOp("-", BinOp(Number("2"), "^", Number("3"))))
+    assert isinstance(tree, Number)
+    assert tree.value == -8
+
+def test_keeps_variable_operands():
+    tree = parse("x * (2 + 3)")
+    assert isinstance(tree, BinOp)
+    assert isinstance(tree.left, Variable)
+    assert isinstance(tree.right, Number) and tree.right.value == 5
+
+def test_huge_power_is_not_folded():
+    assert not _small_power(9, 9 ** 9)
+    tree = parse("if 0 then 9 ^ 9 ^ 9 else 1")
+    assert isinstance(tree.then_branch, BinOp)
+    assert evaluate(tree, Env()) == 1
+
+def test_division_by_zero_is_not_folded():
+    tree = parse("1 / 0")
+    assert isinstance(tree, BinOp)
+    with pytest.raises(ZeroDivisionError):
+        evaluate(tree, Env())
+
+def test_power_is_right_associative():
+    tree = parse("x ^ 3 ^ 2", optimize=False)
+    assert isinstance(tree.left, Variable)
+    assert isinstance(tree.right, BinOp) and tree.right.op == "^"
+    assert parse("2 ^ 3 ^ 2").value == 512
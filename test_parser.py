@@ -0,0 +1,14 @@
+from ast_nodes import Assignment, FunctionDef, Call, Variable, String
+from interpreter import evaluate
+from parser import parse_program
+from environment import Env
+
+def test_parse_program_keeps_semicolon_in_string():
+    # The REPL parses a whole line, so ';' inside a string doesn't split it
+    src = 's = "a;b"; def f(x) : return x + 1; f(2); s'
+    statements = parse_program(src)
+    print(f"\n[test_parse_program_keeps_semicolon_in_string] {statements}")
+    assert [type(stmt) for stmt in statements] == [Assignment, FunctionDef, Call, Variable]
+    assert isinstance(statements[0].value, String) and statements[0].value.value == "a;b"
+    env = Env()
+    assert [evaluate(stmt, env) for stmt in statements] == [None, None, 3, "a;b"]
@@ -58,3 +58,29 @@ def test_wrong_arg_count():
     with pytest.raises(RuntimeError) as excinfo:
         evaluate(ast, env)
     print(f"[test_wrong_arg_count] Output: {excinfo.value}")
+
+def test_function_reads_current_global():
+    src = """
+    y = 1;
+    def f() : return y;
+    f();
+    y = 2;
+    b = f();
+    """
+    result = run_and_get_var(src, 'b')
+    print("\n[test_function_reads_current_global] Input:\n" + src.strip())
+    print(f"[test_function_reads_current_global] Output: b = {result}")
+    assert result == 2  # y is read again, not cached from the first call
+
+def test_ref_to_undefined_variable():
+    src = """
+    def f(ref a) : a = 7;
+    f(zz);
+    """
+    parser = Parser()
+    ast = parser.parse(src)
+    env = Env()
+    print("\n[test_ref_to_undefined_variable] Input:\n" + src.strip())
+    with pytest.raises(NameError, match="Undefined variable: zz") as excinfo:
+        evaluate(ast, env)
+    print(f"[test_ref_to_undefined_variable] Output: {excinfo.value}")